@@ -5,12 +5,19 @@ A simple REST API for collecting and managing student feedback with user authent
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from pymongo import MongoClient
 from bson import ObjectId
 from datetime import datetime, timedelta
 import os
 import jwt
 import bcrypt
+import math
+import random
+import sqlite3
+import tempfile
+import threading
+import time
 from functools import wraps
 
 app = Flask(__name__)
@@ -64,6 +71,213 @@ users_list = []
 feedback_id_counter = 1
 
 
+# ============================================
+# RATE LIMITING
+# ============================================
+#
+# Token buckets are kept in a small SQLite file so every gunicorn worker on the
+# host sees the same counts. Limits are "<requests>/<seconds>": the bucket holds
+# <requests> tokens and refills at <requests>/<seconds> tokens per second.
+# Set a limit to "off" to disable it.
+
+# Rows idle for this long are equivalent to full buckets and can be dropped
+RATE_LIMIT_PRUNE_AFTER = 3600
+
+# Idle connections kept per process. Requests may run on short-lived threads
+# (the threaded dev server starts one per request), so connections are pooled
+# per process rather than per thread.
+RATE_LIMIT_POOL_SIZE = 8
+
+_rate_limit_lock = threading.Lock()
+_rate_limit_pool = {'pid': None, 'path': None, 'ready': False, 'idle': []}
+_rate_limit_store_failing = False
+_proxy_warning_logged = False
+
+
+def parse_rate_limit(value, name='rate limit'):
+    """Parse "<requests>/<seconds>" into (capacity, refill per second), or None if disabled"""
+    if not value or value.strip().lower() in ('off', 'none', '0'):
+        return None
+    count, _, seconds = value.partition('/')
+    try:
+        capacity = float(count)
+        period = float(seconds) if seconds else 1.0
+    except ValueError:
+        capacity = period = 0
+    if not (math.isfinite(capacity) and math.isfinite(period) and capacity >= 1 and period > 0):
+        print(f"⚠️  Invalid {name} {value!r} (expected <requests>/<seconds>, requests >= 1) - limit disabled")
+        return None
+    return capacity, capacity / period
+
+
+app.config['RATE_LIMIT_ENABLED'] = os.getenv('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+for _setting, _default in (('RATE_LIMIT_GLOBAL', '200/1'),
+                           ('RATE_LIMIT_USER', '60/60'),
+                           ('RATE_LIMIT_AUTH_IP', '10/60')):
+    app.config[_setting] = parse_rate_limit(os.getenv(_setting, _default), _setting)
+app.config['RATE_LIMIT_STORAGE'] = os.getenv(
+    'RATE_LIMIT_STORAGE',
+    os.path.join(tempfile.gettempdir(), 'student_feedback_ratelimit.sqlite3')
+)
+
+# Behind a reverse proxy (e.g. Railway) remote_addr is the proxy itself. Only the
+# X-Forwarded-For entry appended by that one trusted hop is used - anything to its
+# left was supplied by the client and cannot be trusted.
+app.config['RATE_LIMIT_TRUST_PROXY'] = os.getenv('RATE_LIMIT_TRUST_PROXY', 'False').lower() == 'true'
+if app.config['RATE_LIMIT_TRUST_PROXY']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1)
+
+
+def _rate_limit_connect():
+    """Borrow a connection to the shared bucket store from this process's pool"""
+    path = app.config['RATE_LIMIT_STORAGE']
+    pid = os.getpid()
+    with _rate_limit_lock:
+        # Start a fresh pool after a fork (gunicorn workers) or when the storage path changes
+        if _rate_limit_pool['pid'] != pid or _rate_limit_pool['path'] != path:
+            for conn in _rate_limit_pool['idle']:
+                conn.close()
+            _rate_limit_pool.update(pid=pid, path=path, ready=False, idle=[])
+        if _rate_limit_pool['idle']:
+            return _rate_limit_pool['idle'].pop()
+        ready = _rate_limit_pool['ready']
+
+    # Keep lock waits short so a contended store fails fast instead of stalling requests
+    conn = sqlite3.connect(path, timeout=0.1, isolation_level=None, check_same_thread=False)
+    try:
+        # Bucket state is disposable, so skip the fsync on every commit
+        conn.execute('PRAGMA synchronous=OFF')
+        if not ready:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS buckets_updated ON buckets(updated)')
+            with _rate_limit_lock:
+                if _rate_limit_pool['path'] == path:
+                    _rate_limit_pool['ready'] = True
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
+
+
+def _rate_limit_release(conn):
+    """Return a healthy connection to the pool, or close it if the pool is full or stale"""
+    with _rate_limit_lock:
+        if (_rate_limit_pool['pid'] == os.getpid()
+                and _rate_limit_pool['path'] == app.config['RATE_LIMIT_STORAGE']
+                and len(_rate_limit_pool['idle']) < RATE_LIMIT_POOL_SIZE):
+            _rate_limit_pool['idle'].append(conn)
+            return
+    conn.close()
+
+
+def take_token(key, limit):
+    """Take one token from bucket `key`. Returns seconds to wait, or 0 if allowed"""
+    global _rate_limit_store_failing
+    capacity, rate = limit
+    now = time.time()
+    try:
+        conn = _rate_limit_connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute(
+                    'SELECT tokens, updated FROM buckets WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    tokens = capacity
+                else:
+                    tokens = min(capacity, row[0] + max(0.0, now - row[1]) * rate)
+
+                if tokens >= 1:
+                    tokens -= 1
+                    retry_after = 0
+                else:
+                    retry_after = (1 - tokens) / rate
+
+                conn.execute(
+                    'INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                    (key, tokens, now)
+                )
+                if random.random() < 0.001:
+                    conn.execute(
+                        'DELETE FROM buckets WHERE updated < ?',
+                        (now - RATE_LIMIT_PRUNE_AFTER,)
+                    )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        except Exception:
+            # Don't hand a connection in an unknown state back to the pool
+            conn.close()
+            raise
+        _rate_limit_release(conn)
+    except sqlite3.Error as e:
+        # Never take the API down because the limiter store is unavailable.
+        # Report the outage once rather than on every request.
+        if not _rate_limit_store_failing:
+            print(f"Rate Limit Error (allowing requests until the store recovers): {e}")
+            _rate_limit_store_failing = True
+        return 0
+    if _rate_limit_store_failing:
+        print("✅ Rate limit store recovered")
+        _rate_limit_store_failing = False
+    return retry_after
+
+
+def check_rate_limit(scope, identity, setting):
+    """Return a 429 response if `identity` is over the `setting` limit, else None"""
+    if not app.config['RATE_LIMIT_ENABLED']:
+        return None
+    limit = app.config[setting]
+    if limit is None:
+        return None
+
+    retry_after = take_token(f'{scope}:{identity}', limit)
+    if not retry_after:
+        return None
+
+    response = jsonify({
+        'success': False,
+        'error': 'Too many requests, please try again later'
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def ip_rate_limited(f):
+    """Throttle an endpoint per client IP (used for the auth endpoints)"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        limited = check_rate_limit('ip', request.remote_addr or 'unknown', 'RATE_LIMIT_AUTH_IP')
+        if limited is not None:
+            return limited
+        return f(*args, **kwargs)
+
+    return decorated
+
+
+@app.before_request
+def global_rate_limit():
+    """Reject requests early once the service-wide limit is exhausted"""
+    global _proxy_warning_logged
+    if (not app.config['RATE_LIMIT_TRUST_PROXY'] and not _proxy_warning_logged
+            and 'X-Forwarded-For' in request.headers):
+        # Behind a proxy every client shares the proxy's address and one per-IP bucket
+        print("⚠️  X-Forwarded-For received but RATE_LIMIT_TRUST_PROXY is off - "
+              "all clients share one per-IP rate limit. Set RATE_LIMIT_TRUST_PROXY=True behind a proxy.")
+        _proxy_warning_logged = True
+    # Health checks and CORS preflights should not use up tokens
+    if request.path == '/health' or request.method == 'OPTIONS':
+        return None
+    return check_rate_limit('global', 'all', 'RATE_LIMIT_GLOBAL')
+
+
 # Authentication decorator
 def token_required(f):
     @wraps(f)
@@ -90,6 +304,10 @@ def token_required(f):
         except jwt.InvalidTokenError:
             return jsonify({'success': False, 'error': 'Invalid token'}), 401
         
+        limited = check_rate_limit('user', current_user, 'RATE_LIMIT_USER')
+        if limited is not None:
+            return limited
+        
         return f(current_user, *args, **kwargs)
     
     return decorated
@@ -118,6 +336,7 @@ def home():
 # ============================================
 
 @app.route('/register', methods=['POST'])
+@ip_rate_limited
 def register():
     """Register a new user"""
     try:
@@ -211,6 +430,7 @@ def register():
 
 
 @app.route('/login', methods=['POST'])
+@ip_rate_limited
 def login():
     """Login user and return JWT token"""
     try:
@@ -9,12 +9,15 @@ import uuid
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app import app  # noqa: E402
+from app import app, parse_rate_limit  # noqa: E402
+from werkzeug.middleware.proxy_fix import ProxyFix  # noqa: E402
 
 
 @pytest.fixture
-def client():
+def client(tmp_path):
     app.config['TESTING'] = True
+    # Fresh rate limit buckets for every test
+    app.config['RATE_LIMIT_STORAGE'] = str(tmp_path / 'ratelimit.sqlite3')
     with app.test_client() as client:
         yield client
 
@@ -136,3 +139,68 @@ def test_add_multiple_feedback(auth_headers, client):
     get_resp = client.get('/feedback', headers=auth_headers)
     data = get_resp.get_json()
     assert data['count'] >= 3
+
+
+def test_login_rate_limited_per_ip(client, monkeypatch):
+    monkeypatch.setitem(app.config, 'RATE_LIMIT_AUTH_IP', parse_rate_limit('2/60'))
+    payload = { 'username': 'nobody', 'password': 'wrongpass' }
+    for _ in range(2):
+        assert client.post('/login', json=payload).status_code == 401
+    resp = client.post('/login', json=payload)
+    assert resp.status_code == 429
+    assert resp.get_json()['success'] is False
+    assert int(resp.headers['Retry-After']) >= 1
+
+
+def test_feedback_rate_limited_per_user(auth_headers, client, monkeypatch):
+    monkeypatch.setitem(app.config, 'RATE_LIMIT_USER', parse_rate_limit('1/60'))
+    assert client.get('/feedback', headers=auth_headers).status_code == 200
+    resp = client.get('/feedback', headers=auth_headers)
+    assert resp.status_code == 429
+    assert 'Retry-After' in resp.headers
+
+
+def test_global_rate_limit_skips_health(client, monkeypatch):
+    monkeypatch.setitem(app.config, 'RATE_LIMIT_GLOBAL', parse_rate_limit('1/60'))
+    assert client.get('/').status_code == 200
+    assert client.get('/').status_code == 429
+    assert client.get('/health').status_code == 200
+
+
+def test_global_rate_limit_skips_preflight(client, monkeypatch):
+    monkeypatch.setitem(app.config, 'RATE_LIMIT_GLOBAL', parse_rate_limit('1/60'))
+    for _ in range(3):
+        client.options('/feedback', headers={
+            'Origin': 'http://example.com',
+            'Access-Control-Request-Method': 'POST'
+        })
+    assert client.get('/').status_code == 200
+
+
+def test_spoofed_forwarded_for_does_not_reset_bucket(client, monkeypatch):
+    monkeypatch.setattr(app, 'wsgi_app', ProxyFix(app.wsgi_app, x_for=1))
+    monkeypatch.setitem(app.config, 'RATE_LIMIT_AUTH_IP', parse_rate_limit('2/60'))
+    payload = { 'username': 'nobody', 'password': 'wrongpass' }
+    statuses = []
+    for i in range(3):
+        # Client-supplied value on the left, proxy-appended address on the right
+        headers = { 'X-Forwarded-For': f'10.0.0.{i}, 203.0.113.7' }
+        statuses.append(client.post('/login', json=payload, headers=headers).status_code)
+    assert statuses == [401, 401, 429]
+
+
+def test_invalid_rate_limits_are_disabled():
+    assert parse_rate_limit('100/min') is None
+    assert parse_rate_limit('0.5/1') is None
+    assert parse_rate_limit('10/inf') is None
+    assert parse_rate_limit('inf/1') is None
+    assert parse_rate_limit('off') is None
+    assert parse_rate_limit('10/60') == (10.0, 10.0 / 60)
+
+
+def test_rate_limit_fails_open_when_store_unavailable(client, monkeypatch, tmp_path):
+    # A directory cannot be opened as a SQLite database
+    monkeypatch.setitem(app.config, 'RATE_LIMIT_STORAGE', str(tmp_path))
+    monkeypatch.setitem(app.config, 'RATE_LIMIT_GLOBAL', parse_rate_limit('1/60'))
+    for _ in range(3):
+        assert client.get('/').status_code == 200